@@ -1,11 +1,59 @@
-from flask import Flask, render_template, request, redirect, url_for, jsonify
+from flask import Flask, render_template, request, redirect, url_for, jsonify, make_response
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.orm import raiseload
 import requests
+from requests.adapters import HTTPAdapter
+import redis
+import pybreaker
+import json
+from celery import Celery
+from concurrent.futures import ThreadPoolExecutor
 from data_models import db, User, Movie, Review
 import os
+import sqlite3
+import threading
 
 app = Flask(__name__)
 
+OMDB_API_URL = 'http://www.omdbapi.com/'
+OMDB_API_KEY = '7cee3b97'
+OMDB_TIMEOUT = (2, 5)  # Connect and read timeouts, in seconds
+# Stop calling OMDb for 30 seconds after 5 consecutive failed requests
+_OMDB_BREAKER = pybreaker.CircuitBreaker(fail_max=5, reset_timeout=30)
+
+# Shared OMDb HTTP session (pooled keep-alive connections) and worker pool for fetching movie details in parallel
+_OMDB_SESSION = requests.Session()
+_OMDB_SESSION.mount('http://', HTTPAdapter(pool_connections=16, pool_maxsize=32))
+_OMDB_POOL = ThreadPoolExecutor(max_workers=16)
+
+# OMDb responses are cached in Redis, keyed by the normalized movie title
+_REDIS = redis.Redis.from_url(os.environ.get('REDIS_URL', 'redis://localhost:6379/0'))
+OMDB_CACHE_TTL = 24 * 60 * 60  # One day, in seconds
+
+# OMDb API calls in flight, by cache key, so concurrent lookups of a title share a single call
+_OMDB_INFLIGHT = {}
+_OMDB_INFLIGHT_LOCK = threading.Lock()
+
+
+def strict_loading(*options):
+    """
+        Adds raiseload("*") to the given loader options when running in debug mode, so accessing a
+        relationship that was not eager loaded raises instead of silently querying once per row.
+
+        Args:
+            *options: The loader options of the query, e.g. selectinload(User.movies).
+
+        Returns:
+            tuple: The loader options to pass to Query.options().
+        """
+    if app.debug:
+        return (*options, raiseload('*'))
+    return options
+
 
 # Define your routes for the API endpoints
 @app.route('/api/users', methods=['GET'])
@@ -16,16 +64,132 @@ def get_users():
         Returns:
             jsonify: A JSON response containing the list of users.
         """
-    users = User.query.all()
+    users = db.session.query(User.id, User.username).all()
     users_data = [{'id': user.id, 'username': user.username} for user in users]
     return jsonify(users_data)
 
 
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///movies.sqlite'  # Use your desired database URI
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Keep warm SQLite connections around instead of opening a new one for each request
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+    'poolclass': QueuePool,
+    'pool_size': 10,
+    'max_overflow': 20,
+    'pool_pre_ping': True,
+    'connect_args': {'check_same_thread': False},
+}
 db.init_app(app)
 
 
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+        Tunes every new SQLite connection: WAL journal so reads don't block on writes,
+        relaxed syncing, a 64 MB page cache, in-memory temp tables and memory-mapped I/O.
+
+        Args:
+            dbapi_connection: The new DBAPI connection.
+            connection_record: The pool record of the connection.
+        """
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute('PRAGMA cache_size=-64000')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.execute('PRAGMA mmap_size=268435456')
+    cursor.close()
+
+
+app.config['CELERY_BROKER_URL'] = os.environ.get('CELERY_BROKER_URL', 'redis://localhost:6379/0')
+app.config['CELERY_RESULT_BACKEND'] = os.environ.get('CELERY_RESULT_BACKEND', 'redis://localhost:6379/0')
+
+# Background worker for slow OMDb lookups, start it with: celery -A app.celery worker
+celery = Celery(app.import_name, broker=app.config['CELERY_BROKER_URL'], backend=app.config['CELERY_RESULT_BACKEND'])
+# Give up quickly when the broker is down, add_movie must not hang on queuing a task
+celery.conf.broker_connection_timeout = 1
+
+
+class ContextTask(celery.Task):
+    """
+        Celery task running inside the Flask application context, so tasks can use the database.
+        """
+    def __call__(self, *args, **kwargs):
+        with app.app_context():
+            return self.run(*args, **kwargs)
+
+
+celery.Task = ContextTask
+
+
+@celery.task(bind=True, max_retries=3, ignore_result=True)
+def enrich_movie(self, movie_id, movie_title):
+    """
+        Fetches the OMDb details of a movie and stores them on the movie.
+
+        Args:
+            movie_id (int): The ID of the movie to enrich.
+            movie_title (str): The title of the movie to look up.
+        """
+    movie = Movie.query.get(movie_id)
+    if not movie or movie.title != movie_title:
+        # The movie was deleted or renamed since this task was queued
+        return
+
+    movie_details = fetch_movie_details(movie_title)
+    if not movie_details:
+        # The API request failed, try again later
+        raise self.retry(countdown=30)
+
+    movie.fill_missing_details(movie_details)
+    db.session.commit()
+
+
+@celery.task(bind=True, max_retries=3, ignore_result=True)
+def retitle_movie(self, movie_id, new_title):
+    """
+        Looks up the new title of a movie on OMDb and, when OMDb knows it, stores it with its details.
+
+        Args:
+            movie_id (int): The ID of the movie to retitle.
+            new_title (str): The new title of the movie.
+        """
+    movie = Movie.query.get(movie_id)
+    if not movie:
+        return
+
+    movie_details = fetch_movie_details(new_title)
+    if not movie_details:
+        # The API request failed, try again later
+        raise self.retry(countdown=30)
+
+    if movie_details.get('imdbID'):
+        movie.replace_details(movie_details)
+        db.session.commit()
+
+
+def queue_task(task, *args):
+    """
+        Queues a Celery task without failing the request when the broker can't be reached.
+
+        Args:
+            task: The Celery task to queue.
+            *args: The arguments of the task.
+
+        Returns:
+            bool: True if the task was queued, False otherwise.
+        """
+    try:
+        task.apply_async(args, retry=False)
+        return True
+    except Exception as e:
+        print("An error occurred while queuing a background task:", str(e))
+        return False
+
+
 @app.route('/api/users/<user_id>/movies', methods=['GET'])
 def get_user_movies_api(user_id):
     """
@@ -37,11 +201,13 @@ def get_user_movies_api(user_id):
         Returns:
             jsonify: A JSON response containing the list of movies for the user.
         """
-    user = User.query.get(user_id)
-    if not user:
+    if not db.session.query(User.id).filter_by(id=user_id).first():
         return jsonify({'error': 'User not found'}), 404
 
-    movies = [{'id': movie.id, 'title': movie.title, 'year': movie.year} for movie in user.movies]
+    # Query the movies directly: movie.user_id is stored as text in movies.sqlite, so relationship
+    # loaders, which match movies to their user in Python, would not attach them to the user
+    user_movies = Movie.query.options(*strict_loading()).filter_by(user_id=user_id).order_by(Movie.id)
+    movies = [{'id': movie.id, 'title': movie.title, 'year': movie.year} for movie in user_movies]
     return jsonify(movies)
 
 
@@ -74,12 +240,112 @@ def add_user_movie(user_id):
     return jsonify({'message': 'Movie added successfully'})
 
 
+@app.route('/api/users/<user_id>/movies/bulk', methods=['POST'])
+def add_user_movies_bulk(user_id):
+    """
+        Add several movies to a user's list of movies in a single transaction.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            jsonify: A JSON response confirming the addition of the movies.
+        """
+    if not db.session.query(User.id).filter_by(id=user_id).first():
+        return jsonify({'error': 'User not found'}), 404
+
+    data = request.json
+    if not isinstance(data, list) or not all(isinstance(movie_data, dict) and movie_data.get('title')
+                                             and movie_data.get('year') for movie_data in data):
+        return jsonify({'error': 'A list of movies with title and year is required'}), 400
+
+    # Fetch the OMDb details of all the movies concurrently, then insert them with a single commit
+    movies_details = fetch_many_movie_details([movie_data['title'] for movie_data in data])
+    movies = []
+    for movie_data, movie_details in zip(data, movies_details):
+        movie = Movie(title=movie_data['title'], year=movie_data['year'], rating=movie_data.get('rating', ''),
+                      user_id=user_id, genre='', director='')
+        movie.fill_missing_details(movie_details)
+        movies.append(movie)
+
+    try:
+        db.session.bulk_save_objects(movies)
+        db.session.commit()
+    except IntegrityError as e:
+        # E.g. the same movie twice in the list, none of the movies are added
+        db.session.rollback()
+        print("An error occurred while adding movies:", str(e))
+        return jsonify({'error': 'The movies could not be added, check for duplicate movies'}), 409
+
+    return jsonify({'message': 'Movies added successfully', 'count': len(movies)})
+
+
+@app.route('/api/movies/backfill_details', methods=['POST'])
+def backfill_movie_details():
+    """
+        Stores the OMDb details of the movies that were saved without some of them.
+
+        Returns:
+            jsonify: A JSON response containing the number of movies that were updated.
+        """
+    detail_columns = (Movie.year, Movie.genre, Movie.director, Movie.imdbid, Movie.poster)
+    movies = Movie.query.filter(db.or_(*[column.is_(None) | (column == '') for column in detail_columns])).all()
+
+    movies_details = fetch_many_movie_details([movie.title for movie in movies])
+    for movie, movie_details in zip(movies, movies_details):
+        movie.fill_missing_details(movie_details)
+    db.session.commit()
+
+    return jsonify({'message': 'Movie details updated successfully', 'count': len(movies)})
+
+
 # Create the database tables
 with app.app_context():
     db.create_all()
+    # Add the columns introduced after the database was first created
+    if 'poster' not in {column['name'] for column in inspect(db.engine).get_columns('movie')}:
+        db.session.execute(text('ALTER TABLE movie ADD COLUMN poster VARCHAR(300)'))
+        db.session.commit()
+    # create_all() only creates the indexes of new tables
+    for index in Movie.__table__.indexes:
+        index.create(db.engine, checkfirst=True)
 
 
-def fetch_movie_details(movie_title):
+def request_movie_details(movie_title):
+    """
+        Fetches movie details from the OMDb API, sharing the API call with the concurrent requests for the same title.
+
+        Args:
+            movie_title (str): The title of the movie.
+
+        Returns:
+            dict: A dictionary containing the movie details, or an empty dictionary if the API request fails.
+        """
+    key = omdb_cache_key(movie_title)
+    with _OMDB_INFLIGHT_LOCK:
+        inflight = _OMDB_INFLIGHT.get(key)
+        is_leader = inflight is None
+        if is_leader:
+            inflight = _OMDB_INFLIGHT[key] = (threading.Event(), [])
+    done, result = inflight
+
+    if not is_leader:
+        # Another thread is already calling the API for this title, wait for its answer
+        done.wait()
+        return result[0]
+
+    try:
+        result.append(call_omdb_api(movie_title))
+    finally:
+        if not result:
+            result.append({})
+        with _OMDB_INFLIGHT_LOCK:
+            del _OMDB_INFLIGHT[key]
+        done.set()
+    return result[0]
+
+
+def call_omdb_api(movie_title):
     """
         Fetches movie details from the OMDb API based on the provided movie title.
 
@@ -93,12 +359,8 @@ def fetch_movie_details(movie_title):
             requests.RequestException: If an error occurs during the API request.
         """
 
-    api_key = '7cee3b97'
-    url = f'http://www.omdbapi.com/?apikey={api_key}&t={movie_title}'
-
     try:
-        response = requests.get(url)
-        response.raise_for_status()
+        response = get_from_omdb_api(movie_title)
 
         if response.status_code == 200:
             movie_data = response.json()
@@ -106,21 +368,129 @@ def fetch_movie_details(movie_title):
         else:
             # Handle the case when the API request fails
             return {}
+    except pybreaker.CircuitBreakerError as e:
+        # OMDb kept failing recently, don't wait on it until the breaker resets
+        print("The OMDb API is unavailable:", str(e))
+        return {}
     except requests.RequestException as e:
         # Handle request exceptions
         print("An error occurred during the API request:", str(e))
         return {}
 
 
+@_OMDB_BREAKER
+def get_from_omdb_api(movie_title):
+    """
+        Sends the OMDb API request for a movie title, through the OMDb circuit breaker.
+
+        Args:
+            movie_title (str): The title of the movie.
+
+        Returns:
+            requests.Response: The successful API response.
+
+        Raises:
+            requests.RequestException: If the API request fails or times out.
+            pybreaker.CircuitBreakerError: If the circuit breaker is open.
+        """
+    response = _OMDB_SESSION.get(OMDB_API_URL, params={'apikey': OMDB_API_KEY, 't': movie_title},
+                                 timeout=OMDB_TIMEOUT)
+    response.raise_for_status()
+    return response
+
+
+def fetch_movie_details(movie_title):
+    """
+        Fetches movie details from the OMDb cache, or from the OMDb API on a cache miss.
+
+        Args:
+            movie_title (str): The title of the movie.
+
+        Returns:
+            dict: A dictionary containing the movie details, or an empty dictionary if the API request fails.
+        """
+    cache_key = omdb_cache_key(movie_title)
+    try:
+        cached_movie_data = _REDIS.get(cache_key)
+        if cached_movie_data is not None:
+            return json.loads(cached_movie_data)
+    except redis.RedisError as e:
+        # The cache is best effort, fall back to the API when Redis is unavailable
+        print("An error occurred while reading the OMDb cache:", str(e))
+
+    movie_data = request_movie_details(movie_title)
+    if movie_data:
+        try:
+            _REDIS.setex(cache_key, OMDB_CACHE_TTL, json.dumps(movie_data))
+        except redis.RedisError as e:
+            print("An error occurred while writing the OMDb cache:", str(e))
+    return movie_data
+
+
+def fetch_many_movie_details(movie_titles):
+    """
+        Fetches the details of several movies, reading the OMDb cache in a single round-trip
+        and requesting only the cache misses from the OMDb API, concurrently.
+
+        Args:
+            movie_titles (list): The titles of the movies.
+
+        Returns:
+            list: The movie details dictionaries, in the order of the given titles.
+        """
+    if not movie_titles:
+        return []
+
+    cache_keys = [omdb_cache_key(movie_title) for movie_title in movie_titles]
+    try:
+        cached_movies_data = _REDIS.mget(cache_keys)
+    except redis.RedisError as e:
+        print("An error occurred while reading the OMDb cache:", str(e))
+        cached_movies_data = [None] * len(cache_keys)
+
+    movies_data = [json.loads(cached) if cached is not None else None for cached in cached_movies_data]
+    misses = [index for index, movie_data in enumerate(movies_data) if movie_data is None]
+    fetched_movies_data = _OMDB_POOL.map(request_movie_details, [movie_titles[index] for index in misses])
+
+    pipeline = _REDIS.pipeline(transaction=False)
+    for index, movie_data in zip(misses, fetched_movies_data):
+        movies_data[index] = movie_data
+        if movie_data:
+            pipeline.setex(cache_keys[index], OMDB_CACHE_TTL, json.dumps(movie_data))
+    try:
+        pipeline.execute()
+    except redis.RedisError as e:
+        print("An error occurred while writing the OMDb cache:", str(e))
+
+    return movies_data
+
+
+def omdb_cache_key(movie_title):
+    """
+        Builds the Redis key under which the OMDb details of a movie are cached.
+
+        Args:
+            movie_title (str): The title of the movie.
+
+        Returns:
+            str: The cache key for the movie title.
+        """
+    return f"omdb:{movie_title.lower().strip()}"
+
+
 @app.route('/')
 def home():
     """
        Renders the home page of the MovieWeb App.
 
        Returns:
-           str: The rendered HTML template for the home page.
+           Response: The rendered HTML template for the home page, cacheable for an hour.
        """
-    return render_template('index.html')
+    # The home page never changes, let browsers and proxies serve it for an hour
+    response = make_response(render_template('index.html'))
+    response.cache_control.public = True
+    response.cache_control.max_age = 3600
+    return response
 
 
 @app.route('/users')
@@ -135,7 +505,7 @@ def list_users():
             Exception: If an error occurs while retrieving user data.
         """
     try:
-        users = User.query.all()
+        users = db.session.query(User.id, User.username).all()
         return render_template('users.html', users=users)
     except Exception as e:
         # Handle exceptions related to getting users
@@ -170,18 +540,24 @@ def get_user_movies(user_id):
     #     print("An error occurred while retrieving user movies:", str(e))
     #     return render_template('error.html', error_message="An error occurred while retrieving user movies")
     try:
-        user = User.query.get(user_id)
-
-        if not user:
+        if not db.session.query(User.id).filter_by(id=user_id).first():
             return render_template('error.html', error_message="User not found.")
 
-        movies = user.movies
-        movies_with_details = []
-
-        for movie in movies:
-            movie_details = fetch_movie_details(movie.title)  # Fetch movie details from OMDb API
-            combined_movie_data = {**movie.to_dict(), **movie_details}
-            movies_with_details.append(combined_movie_data)
+        movies_with_details = Movie.list_for_user(user_id)
+        # Details are stored with the movies, only ask OMDb for the ones still missing some of them
+        incomplete_movies = [movie for movie in movies_with_details if not Movie.has_details(movie)]
+        movies_details = fetch_many_movie_details([movie['Title'] for movie in incomplete_movies])
+        for movie, movie_details in zip(incomplete_movies, movies_details):
+            # Only fill in what the row is missing, the stored title and imdbID stay the ones the links use
+            missing_details = {key: movie_details[key] for key in Movie.DETAIL_KEYS
+                               if not movie[key] and movie_details.get(key)}
+            movie.update(missing_details)
+            if missing_details:
+                # Store them too, so the links built from imdbID find the movie
+                Movie.query.filter_by(id=movie['Id']).update(
+                    {Movie.DETAIL_KEYS[key]: value for key, value in missing_details.items()},
+                    synchronize_session=False)
+        db.session.commit()
 
         return render_template('movies.html', movies=movies_with_details, user_id=user_id)
     except Exception as e:
@@ -233,9 +609,10 @@ def delete_user(user_id):
             if not user:
                 return render_template('error.html', error_message="User not found.")
 
-            # Delete user's movies first
-            for movie in user.movies:
-                db.session.delete(movie)
+            # Delete the user's reviews and movies, each in a single statement. Reviews are matched on their
+            # user: add_review stores the IMDb ID in Review.movie_id, not the ID of the movie row
+            Review.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+            Movie.query.filter_by(user_id=user_id).delete(synchronize_session=False)
 
             db.session.delete(user)
             db.session.commit()
@@ -268,20 +645,15 @@ def add_movie(user_id):
             movie_title = request.form['movie_title']
             movie_rating = request.form['movie_rating']
 
-            movie_details = fetch_movie_details(movie_title)
-
-            if not movie_details:
-                return render_template('error.html', error_message="Movie details not found.")
-
-            movie_year = movie_details.get('Year', '')
-            movie_genre = movie_details.get('Genre', '')
-            movie_director = movie_details.get('Director', '')
-            movie_imdbid = movie_details.get('imdbID', '')
-
-            movie = Movie(title=movie_title, rating=movie_rating, user_id=user_id, year=movie_year, genre=movie_genre, director=movie_director, imdbid=movie_imdbid)
+            movie = Movie(title=movie_title, rating=movie_rating, user_id=user_id, year='', genre='', director='')
             db.session.add(movie)
             db.session.commit()
 
+            # OMDb details are stored by the background worker, the form submit doesn't wait for the API
+            if not queue_task(enrich_movie, movie.id, movie_title):
+                movie.fill_missing_details(fetch_movie_details(movie_title))
+                db.session.commit()
+
             return redirect(url_for('get_user_movies', user_id=user_id))
         except Exception as e:
             # Handle exceptions related to adding a movie
@@ -314,25 +686,24 @@ def update_movie(user_id, movie_id):
             new_title = request.form['new_title']
             new_rating = request.form['new_rating']
 
-            movie = Movie.query.filter_by(imdbid=movie_id).first()
+            movie = Movie.query.options(*strict_loading()).filter_by(user_id=user_id, imdbid=movie_id).first()
 
             if not movie:
                 return render_template('error.html', error_message="Movie not found.")
 
-            # Fetch movie details using new title
+            # Check the new title on OMDb, usually a cache hit, so an unknown title is still refused
             new_movie_details = fetch_movie_details(new_title)
 
-            if not new_movie_details:
+            if new_movie_details and not new_movie_details.get('imdbID'):
                 return render_template('error.html', error_message="New movie details not found.")
 
-            # Update movie information with new details
-            movie.title = new_movie_details.get('Title', movie.title)
-            movie.year = new_movie_details.get('Year', movie.year)
-            movie.genre = new_movie_details.get('Genre', movie.genre)
-            movie.director = new_movie_details.get('Director', movie.director)
-            movie.imdbid = new_movie_details.get('imdbID', movie.imdbid)
-            movie.rating = new_rating
+            if new_movie_details:
+                movie.replace_details(new_movie_details)
+            elif not queue_task(retitle_movie, movie.id, new_title):
+                return render_template('error.html', error_message="New movie details not found.")
+            # Otherwise OMDb couldn't be reached, the background worker retitles the movie once it answers
 
+            movie.rating = new_rating
             db.session.commit()
 
             return redirect(url_for('get_user_movies', user_id=user_id))
@@ -342,8 +713,7 @@ def update_movie(user_id, movie_id):
             return render_template('error.html', error_message="An error occurred while updating a movie")
 
     try:
-        user_movies = User.query.get(user_id).movies  # Fetch user's movies
-        movie = next((movie for movie in user_movies if movie.imdbid == movie_id), None)
+        movie = Movie.query.options(*strict_loading()).filter_by(user_id=user_id, imdbid=movie_id).first()
         if movie:
             return render_template('update_movie.html', user_id=user_id, movie=movie)
         else:
@@ -369,7 +739,7 @@ def delete_movie(user_id):
             Exception: If an error occurs while deleting a movie.
     """
     # user = db.session.get(User, user_id)
-    user = User.query.get(user_id)
+    user = User.query.options(*strict_loading()).get(user_id)
 
     if not user:
         return render_template('error.html', error_message="User not found.")
@@ -377,7 +747,7 @@ def delete_movie(user_id):
     if request.method == 'POST':
         try:
             movie_id = request.args.get('movie_id')
-            movie_to_delete = next((movie for movie in user.movies if movie.imdbid == movie_id), None)
+            movie_to_delete = Movie.query.options(*strict_loading()).filter_by(user_id=user_id, imdbid=movie_id).first()
 
             if movie_to_delete:
                 db.session.delete(movie_to_delete)
@@ -413,12 +783,12 @@ def add_review(user_id, movie_id):
             review_text = request.form['review_text']
             rating = request.form['rating']
 
-            user = User.query.get(user_id)
+            user = User.query.options(*strict_loading()).get(user_id)
 
             if not user:
                 return render_template('error.html', error_message="User not found.")
 
-            movie = Movie.query.filter_by(imdbid=movie_id).first()
+            movie = Movie.query.options(*strict_loading()).filter_by(imdbid=movie_id).first()
             if not movie:
                 return render_template('error.html', error_message="Movie not found.")
 
@@ -433,8 +803,7 @@ def add_review(user_id, movie_id):
             return render_template('error.html', error_message="An error occurred while adding a review")
 
     try:
-        user_movies = User.query.get(user_id).movies
-        movie = next((movie for movie in user_movies if movie.imdbid == movie_id), None)
+        movie = Movie.query.options(*strict_loading()).filter_by(user_id=user_id, imdbid=movie_id).first()
         if movie:
             # Add the following lines to get the reviews associated with the movie
             reviews = movie.get_reviews()
@@ -502,11 +871,11 @@ def delete_review(user_id, movie_id, review_id):
             Exception: If an error occurs during the review deletion process.
         """
     try:
-        user = User.query.get(user_id)
+        user = User.query.options(*strict_loading()).get(user_id)
         if not user:
             return render_template('error.html', error_message="User not found.")
 
-        movie = Movie.query.filter_by(imdbid=movie_id).first()
+        movie = Movie.query.options(*strict_loading()).filter_by(imdbid=movie_id).first()
         if not movie:
             return render_template('error.html', error_message="Movie not found.")
 
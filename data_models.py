@@ -59,6 +59,7 @@ class Movie(db.Model):
         director (str): The director of the movie.
         user_id (int): The ID of the user who added the movie.
         imdbid (str): The IMDb ID of the movie.
+        poster (str): The URL of the movie poster.
         reviews (relationship): A relationship to the Review model.
 
     Methods:
@@ -66,10 +67,18 @@ class Movie(db.Model):
         delete_movie: Deletes a movie from the database.
         update_movie: Updates movie information in the database.
         to_dict: Converts the movie attributes to a dictionary.
+        list_for_user: Returns the movies of a user as dictionaries, without loading Movie objects.
+        has_details: Checks whether all the OMDb details of a movie dictionary are stored.
+        fill_missing_details: Fills in the empty OMDb details of the movie from an OMDb response.
+        replace_details: Replaces the title and OMDb details of the movie with the ones of an OMDb response.
         get_reviews: Returns a list of reviews associated with the movie.
 
     """
     __tablename__ = 'movie'
+    __table_args__ = (
+        db.Index('ix_movie_user_imdb', 'user_id', 'imdbid'),
+        db.Index('ix_movie_imdbid', 'imdbid'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
     year = db.Column(db.String(4), nullable=False)
@@ -78,8 +87,12 @@ class Movie(db.Model):
     director = db.Column(db.String(50), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     imdbid = db.Column(db.String(10), unique=True)  # Define imdbid column
+    poster = db.Column(db.String(300))
     reviews = db.relationship('Review', backref='movie', lazy=True)
 
+    # Keys of the movie dictionaries holding details that come from OMDb, with the columns storing them
+    DETAIL_KEYS = {'Year': 'year', 'Genre': 'genre', 'Director': 'director', 'imdbID': 'imdbid', 'Poster': 'poster'}
+
     def __repr__(self):
         return f"ID={self.id}, title='{self.title}', rating='{self.rating}'"
 
@@ -123,9 +136,45 @@ class Movie(db.Model):
             'Genre': self.genre,
             'Director': self.director,
             'Rating': self.rating,
+            'imdbID': self.imdbid,
+            'Poster': self.poster,
             # Add more attributes as needed
         }
 
+    @classmethod
+    def list_for_user(cls, user_id):
+        rows = db.session.query(
+            cls.id.label('Id'),
+            cls.title.label('Title'),
+            cls.year.label('Year'),
+            cls.genre.label('Genre'),
+            cls.director.label('Director'),
+            cls.rating.label('Rating'),
+            cls.imdbid.label('imdbID'),
+            cls.poster.label('Poster'),
+        ).filter(cls.user_id == user_id).order_by(cls.id)
+        return [dict(row._mapping) for row in rows]
+
+    @classmethod
+    def has_details(cls, movie_dict):
+        return all(movie_dict[key] for key in cls.DETAIL_KEYS)
+
+    def fill_missing_details(self, movie_details):
+        # Only empty columns are filled: a stored imdbid keys the movie URLs and its reviews
+        self.year = self.year or movie_details.get('Year', self.year)
+        self.genre = self.genre or movie_details.get('Genre', self.genre)
+        self.director = self.director or movie_details.get('Director', self.director)
+        self.imdbid = self.imdbid or movie_details.get('imdbID', self.imdbid)
+        self.poster = self.poster or movie_details.get('Poster', self.poster)
+
+    def replace_details(self, movie_details):
+        self.title = movie_details.get('Title', self.title)
+        self.year = movie_details.get('Year', self.year)
+        self.genre = movie_details.get('Genre', self.genre)
+        self.director = movie_details.get('Director', self.director)
+        self.imdbid = movie_details.get('imdbID', self.imdbid)
+        self.poster = movie_details.get('Poster', self.poster)
+
     def get_reviews(self):
         return Review.query.filter_by(movie_id=self.id).all()
 
@@ -1,21 +1,62 @@
-import json
+import os
+import shutil
+import tempfile
+
+import orjson
 
 
 class JSONDataManager:
     def __init__(self, filename):
         self.filename = filename
         self.data = []
+        self._by_id = {}
+        self._cached_stat = None
 
     def load_data(self):
+        # Only parse the file again when it changed since it was last loaded or saved
         try:
-            with open(self.filename, 'r') as file:
-                self.data = json.load(file)
+            file_stat = self._stat_data_file()
         except FileNotFoundError:
             self.data = []
-
-    def save_data(self, user_id):
-        with open(self.filename, 'w') as file:
-            json.dump(self.data, file)
+            self._by_id = {}
+            self._cached_stat = None
+            return
+        if file_stat == self._cached_stat:
+            return
+
+        with open(self.filename, 'rb') as file:
+            self.data = orjson.loads(file.read())
+        self._index_users()
+        self._cached_stat = file_stat
+
+    def _stat_data_file(self):
+        # The mtime alone misses rewrites within the same timestamp tick, saves replace the inode
+        file_stat = os.stat(self.filename)
+        return file_stat.st_mtime_ns, file_stat.st_size, file_stat.st_ino
+
+    def _index_users(self):
+        # Users by ID, the first user wins when several share an ID like in a linear scan
+        self._by_id = {user['id']: user for user in reversed(self.data)}
+
+    def save_data(self):
+        # Write to a temporary file next to the data file and swap it in, so a crash never leaves a truncated file
+        directory = os.path.dirname(self.filename) or '.'
+        file = tempfile.NamedTemporaryFile('wb', dir=directory, delete=False)
+        try:
+            with file:
+                file.write(orjson.dumps(self.data))
+                file.flush()
+                os.fsync(file.fileno())
+            # The temporary file is created private, keep the permissions of the data file
+            if os.path.exists(self.filename):
+                shutil.copymode(self.filename, file.name)
+            os.replace(file.name, self.filename)
+        except BaseException:
+            os.unlink(file.name)
+            # self.data holds changes the file doesn't have, make the next load read the file again
+            self._cached_stat = None
+            raise
+        self._cached_stat = self._stat_data_file()
 
     def get_all_users(self):
         self.load_data()
@@ -23,9 +64,9 @@ class JSONDataManager:
 
     def get_user_movies(self, user_id):
         self.load_data()
-        for user in self.data:
-            if user['id'] == user_id:
-                return user['movies']
+        user = self._by_id.get(user_id)
+        if user:
+            return user['movies']
         return []
 
     # Add more methods as needed
@@ -37,33 +78,36 @@ class JSONDataManager:
 
         self.load_data()
         self.data.append(user)
-        self.save_data(user["id"])
+        self._by_id.setdefault(user['id'], user)
+        self.save_data()
 
     def delete_user(self, user_id):
         self.load_data()
         self.data = [user for user in self.data if user['id'] != user_id]
-        self.save_data(user_id)
+        self._by_id.pop(user_id, None)
+        self.save_data()
 
     def add_movie_to_user(self, user_id, movie):
         self.load_data()
-        for user in self.data:
-            if user['id'] == user_id:
-                user['movies'].append(movie)
-                self.save_data(user_id)
-                return
+        user = self._by_id.get(user_id)
+        if user:
+            user['movies'].append(movie)
+            self.save_data()
+            return
         raise ValueError(f"User with ID {user_id} not found.")
 
     def delete_movie(self, user_id, movie_title):
-        users = self.get_all_users()
-
-        for user in users:
-            if user['id'] == user_id:
-                movies = user['movies']
-                for movie in movies:
-                    if movie['Title'] == movie_title:
-                        movies.remove(movie)
-                        self.save_data(users)
-                        return
+        self.load_data()
+        user = self._by_id.get(user_id)
+        if not user:
+            return
+
+        movies = user['movies']
+        for index, movie in enumerate(movies):
+            if movie['Title'] == movie_title:
+                del movies[index]
+                self.save_data()
+                return
 
     def update_movie(self, user_id, movie_id, new_title, new_rating):
         """
@@ -71,7 +115,7 @@ class JSONDataManager:
 
         Args:
             user_id (str): The ID of the user.
-            movie_id (str): The ID of the movie.
+            movie_id (str): The IMDb ID of the movie.
             new_title (str): The new title of the movie.
             new_rating (str): The new rating of the movie.
 
@@ -79,19 +123,14 @@ class JSONDataManager:
             Exception: If an error occurs while updating the movie.
         """
         try:
-            data = self._load_data()
-            users = data.get("users")
-            if users:
-                for user in users:
-                    if user.get("id") == user_id:
-                        movies = user.get("movies")
-                        if movies:
-                            for movie in movies:
-                                if movie.get("id") == movie_id:
-                                    movie["Title"] = new_title
-                                    movie["Rating"] = new_rating
-                                    break
+            self.load_data()
+            user = self._by_id.get(user_id)
+            if user:
+                for movie in user.get("movies", []):
+                    if movie.get("imdbID") == movie_id:
+                        movie["Title"] = new_title
+                        movie["Rating"] = new_rating
                         break
-            self._save_data(data)
+            self.save_data()
         except Exception as e:
             raise Exception("An error occurred while updating the movie:", str(e))